@@ -0,0 +1,110 @@
+import argparse
+import hmac
+import json
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jobs
+import pipeline
+
+logger = logging.getLogger(__name__)
+
+# 상태 없는 파이프라인 API
+# - POST /jobs        {"kind": ..., "payload": {...}} → 202 {"job_id": ...}
+# - GET  /jobs/<id>   작업 상태 및 결과 조회 (폴링, 스트리밍 중인 부분 결과 포함)
+# - DELETE /jobs/<id> 작업 취소 요청 (이미 끝난 작업은 결과와 함께 삭제)
+# - GET  /health
+# 모든 상태는 공유 작업 큐(jobs)에 있으므로 인스턴스를 여러 개 띄워도 된다.
+# PIPELINE_API_TOKEN 이 설정되면 /health 를 제외한 모든 요청에 같은 값의 X-Pipeline-Token 헤더가 필요하다.
+
+API_TOKEN = os.getenv("PIPELINE_API_TOKEN", "")
+
+
+class PipelineHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    # 공유 토큰 확인 (실패 시 401 응답 후 False)
+    def _authorized(self):
+        if not API_TOKEN or hmac.compare_digest(self.headers.get("X-Pipeline-Token", ""), API_TOKEN):
+            return True
+        self._send_json(401, {"error": "인증 토큰이 올바르지 않습니다."})
+        return False
+
+    def do_GET(self):
+        if self.path != "/health" and not self._authorized():
+            return
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path.startswith("/jobs/"):
+            job_id = self.path[len("/jobs/"):]
+            job = jobs.get(job_id) if job_id.isalnum() else None
+            if job is None:
+                self._send_json(404, {"error": "작업을 찾을 수 없습니다."})
+            else:
+                self._send_json(200, job)
+        else:
+            self._send_json(404, {"error": "잘못된 경로입니다."})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != "/jobs":
+            self._send_json(404, {"error": "잘못된 경로입니다."})
+            return
+        try:
+            request = self._read_json()
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "요청 본문이 올바른 JSON 이 아닙니다."})
+            return
+        kind = request.get("kind")
+        if kind not in pipeline.STEPS:
+            self._send_json(400, {"error": f"알 수 없는 작업 종류입니다: {kind}"})
+            return
+        job_id = jobs.submit(kind, request.get("payload", {}))
+        self._send_json(202, {"job_id": job_id})
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        job_id = self.path[len("/jobs/"):] if self.path.startswith("/jobs/") else ""
+        job = jobs.get(job_id) if job_id.isalnum() else None
+        if job is None:
+            self._send_json(404, {"error": "작업을 찾을 수 없습니다."})
+            return
+        if job["status"] in jobs.FINISHED_STATUSES:
+            jobs.discard(job_id)
+        else:
+            jobs.cancel(job_id)
+        self._send_json(202, {"job_id": job_id})
+
+    def log_message(self, format, *args):
+        logger.info(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 API 서버")
+    # 기본값은 같은 호스트에서만 접근 가능 (외부에 열 때는 PIPELINE_API_TOKEN 설정)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if args.host not in ("127.0.0.1", "localhost") and not API_TOKEN:
+        logger.warning("PIPELINE_API_TOKEN 없이 외부 주소에서 요청을 받습니다. 누구나 GPT 작업을 등록할 수 있습니다.")
+    server = ThreadingHTTPServer((args.host, args.port), PipelineHandler)
+    logger.info(f"파이프라인 API 시작: {args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
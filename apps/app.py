@@ -1,242 +1,150 @@
 import streamlit as st
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
-from openai import AzureOpenAI
-from dotenv import load_dotenv
-import os
-from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from docx import Document
-from docx.shared import Pt, RGBColor, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from pptx import Presentation
-from pptx.util import Inches, Pt as PptPt
-from pptx.enum.text import PP_ALIGN
-from pptx.dml.color import RGBColor as PptRGBColor
+import base64
+import client
+import jobs
+from sections import REPORT_SECTIONS, join_sections
 
-# 환경 변수 로드
-load_dotenv()
-
-# Azure 설정
-SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
-SEARCH_KEY = os.getenv("AZURE_SEARCH_KEY")
-SEARCH_INDEX = os.getenv("AZURE_SEARCH_INDEX")
-OPENAI_API_KEY = os.getenv("AZURE_OPENAI_KEY")
-OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-
-# 클라이언트 초기화
-@st.cache_resource
-def get_search_client():
-    return SearchClient(
-        endpoint=SEARCH_ENDPOINT,
-        index_name=SEARCH_INDEX,
-        credential=AzureKeyCredential(SEARCH_KEY)
-    )
-
-@st.cache_resource
-def get_openai_client():
-    return AzureOpenAI(
-        api_key=OPENAI_API_KEY,
-        api_version="2024-12-01-preview",
-        azure_endpoint=OPENAI_ENDPOINT
-    )
-
-search_client = get_search_client()
-openai_client = get_openai_client()
-
-# GPT 호출 함수
-def ask_openai(prompt=None, messages=None):
+# 파이프라인 작업 실행 (오류 시 화면에 표시 후 None 반환)
+def run_step(kind, error_label, **payload):
     try:
-        if messages:
-            response = openai_client.chat.completions.create(
-                model=OPENAI_DEPLOYMENT,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=2000
-            )
-        elif prompt:
-            response = openai_client.chat.completions.create(
-                model=OPENAI_DEPLOYMENT,
-                messages=[
-                    {"role": "system", "content": "당신은 산업 분석 전문가입니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-        else:
-            raise ValueError("prompt 또는 messages 중 하나는 반드시 필요합니다.")
-        return response.choices[0].message.content
+        return client.run(kind, **payload)
     except Exception as e:
-        st.error(f"❌ GPT 호출 중 오류 발생: {str(e)}")
+        st.error(f"❌ {error_label} 중 오류 발생: {str(e)}")
         return None
 
-# PDF 생성 함수
-def create_pdf(content, title):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    # 한글 폰트 등록
+# GPT 호출 토큰 사용량 기록
+def record_usage(label, result):
+    if "usage" not in result:
+        return
+    st.session_state.usage_log.append({"label": label, **result["usage"]})
+
+# 진행 중인 GPT 작업 취소 (중단 버튼, 입력 변경, 초기화 시)
+def cancel_active_job():
+    active = st.session_state.get("active_job")
+    if active:
+        try:
+            client.cancel(active["id"])
+        except Exception:
+            pass
+        st.session_state.active_job = None
+
+# GPT 작업을 백그라운드로 시작 (partial 이 주어지면 중단된 내용에 이어서 작성)
+def start_job(kind, label, payload, partial=None):
+    cancel_active_job()
     try:
-        pdfmetrics.registerFont(TTFont('NanumGothic', 'NanumGothic-Regular.ttf'))
-        pdfmetrics.registerFont(TTFont('NanumGothic-Bold', 'NanumGothic-Bold.ttf'))
-        pdfmetrics.registerFont(TTFont('NanumGothic-ExtraBold', 'NanumGothic-ExtraBold.ttf'))
-        font_normal = 'NanumGothic'
-        font_bold = 'NanumGothic-Bold'
-        font_extra_bold = 'NanumGothic-ExtraBold'
-    except Exception as e:
-        st.warning(f"⚠️ 한글 폰트 로딩 실패: {str(e)}. 기본 폰트를 사용합니다.")
-        font_normal = 'Helvetica'
-        font_bold = 'Helvetica-Bold'
-        font_extra_bold = 'Helvetica-Bold'
-    
-    styles = getSampleStyleSheet()
-    
-    # 커스텀 스타일 정의
-    styles.add(ParagraphStyle(
-        name='CustomTitle', 
-        parent=styles['Heading1'], 
-        fontSize=24, 
-        textColor='blue', 
-        spaceAfter=30, 
-        alignment=1,
-        fontName=font_extra_bold,
-        leading=30
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='CustomHeading', 
-        parent=styles['Heading2'], 
-        fontSize=16, 
-        spaceAfter=12, 
-        spaceBefore=20,
-        fontName=font_bold,
-        leading=20
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='CustomBody', 
-        parent=styles['BodyText'], 
-        fontSize=11, 
-        spaceAfter=12,
-        fontName=font_normal,
-        leading=18,
-        wordWrap='CJK'
-    ))
-    
-    story = []
-    story.append(Paragraph(title, styles['CustomTitle']))
-    story.append(Spacer(1, 0.5*inch))
-    
-    lines = content.split('\n')
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        if line.startswith('## '):
-            story.append(Spacer(1, 0.3*inch))
-            story.append(Paragraph(line.replace('## ', ''), styles['CustomHeading']))
-        elif line.startswith('# '):
-            continue
+        if partial:
+            job_id = client.submit("continue", step=kind, payload=payload, partial=partial)
         else:
-            story.append(Paragraph(line, styles['CustomBody']))
-    
+            job_id = client.submit(kind, **payload)
+    except Exception as e:
+        st.error(f"❌ GPT 호출 중 오류 발생: {str(e)}")
+        return
+    st.session_state.active_job = {"id": job_id, "kind": kind, "label": label, "payload": payload}
+    st.session_state.partial_result = None
+    st.rerun()
+
+# 끝난 GPT 작업 결과를 세션 상태에 반영
+def apply_job_result(active, job):
+    if job["status"] == jobs.STATUS_DONE and not job["result"]:
+        job = {**job, "status": jobs.STATUS_FAILED, "error": "결과가 비어 있습니다."}
+    if job["status"] != jobs.STATUS_DONE:
+        # 중단/시간 초과/오류: 부분 결과를 보존해 이어서 작성할 수 있도록 함
+        st.session_state.partial_result = {
+            **active,
+            "content": job.get("partial", ""),
+            "status": job["status"],
+            "error": job.get("error"),
+        }
+        return
+
+    result = job["result"]
+    payload = active["payload"]
+    record_usage(active["label"], result)
+    if active["kind"] == "recommend":
+        if payload["keyword"] == st.session_state.keyword:
+            st.session_state.recommendations_raw = result["raw"]
+            st.session_state.recommendation_list = result["list"]
+    elif active["kind"] == "answer":
+        st.session_state.chat_history.append((payload["question"], result["content"]))
+    elif active["kind"] == "write_section":
+        if payload["section_index"] == st.session_state.current_section_index:
+            st.session_state.report_sections.append({
+                "title": REPORT_SECTIONS[payload["section_index"]]["title"],
+                "content": result["content"]
+            })
+            st.session_state.current_section_index += 1
+    else:
+        st.session_state.report_sections[payload["section_index"]]["content"] = result["content"]
+        st.session_state.editing_mode = False
+
+# 진행 중인 GPT 작업 표시 (스트리밍 중인 내용을 주기적으로 갱신하고, 끝나면 전체 화면 갱신)
+@st.fragment(run_every=1)
+def show_active_job():
+    active = st.session_state.active_job
+    if not active:
+        return
     try:
-        doc.build(story)
+        job = client.get(active["id"])
     except Exception as e:
-        st.error(f"PDF 생성 중 오류: {str(e)}")
-        return None
-    
-    buffer.seek(0)
-    return buffer
+        # 일시적인 조회 오류는 표시만 하고 다음 갱신 때 다시 확인
+        st.warning(f"⚠️ {active['label']} 상태 조회 중 오류 발생: {str(e)}")
+        return
+    if job is None:
+        # 보관 기간이 지나 삭제되었거나 다른 화면에서 삭제된 작업
+        job = {"status": jobs.STATUS_FAILED, "error": "작업을 찾을 수 없습니다.", "partial": ""}
+    if job["status"] in jobs.FINISHED_STATUSES:
+        st.session_state.active_job = None
+        apply_job_result(active, job)
+        try:
+            client.discard(active["id"])
+        except Exception:
+            pass
+        st.rerun()
 
-# Word 생성 함수
-def create_word(content, title):
-    doc = Document()
-    
-    title_para = doc.add_heading(title, level=0)
-    title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title_run = title_para.runs[0]
-    title_run.font.size = Pt(24)
-    title_run.font.color.rgb = RGBColor(0, 112, 192)
-    
-    doc.add_paragraph()
-    
-    lines = content.split('\n')
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        if line.startswith('## '):
-            doc.add_heading(line.replace('## ', ''), level=1)
-        elif line.startswith('# '):
-            continue
-        else:
-            para = doc.add_paragraph(line)
-            para.style.font.size = Pt(11)
-    
-    buffer = BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer
+    if job["status"] == jobs.STATUS_QUEUED:
+        st.info(f"⏳ {active['label']} 대기 중... (다른 작업이 끝나면 시작됩니다)")
+        if st.button("⏹ 취소", key=f"cancel_job_{active['id']}"):
+            client.cancel(active["id"])
+        return
+
+    st.info(f"🔄 {active['label']} 중... (중단해도 지금까지 작성된 내용은 보존됩니다)")
+    if job["partial"]:
+        st.markdown(job["partial"])
+    if st.button("⏹ 작성 중단", key=f"cancel_job_{active['id']}"):
+        client.cancel(active["id"])
+
+# 중단된 GPT 작업의 부분 결과 표시 및 이어서 작성
+def show_partial_result():
+    partial = st.session_state.partial_result
+    if partial["status"] == jobs.STATUS_FAILED:
+        st.warning(f"⚠️ '{partial['label']}' 작업이 중단되었습니다: {partial['error']}")
+    else:
+        st.warning(f"⚠️ '{partial['label']}' 작업이 중단되었습니다.")
+
+    if partial["content"]:
+        with st.expander("📄 중단 전까지 작성된 내용", expanded=True):
+            st.markdown(partial["content"])
+    # 이어서 작성할 수 없는 작업(산업군 추천)은 버리고 다시 시작
+    if partial["kind"] not in jobs.RESUMABLE_KINDS:
+        if st.button("🔄 다시 시도", use_container_width=True, key="retry_job_btn"):
+            st.session_state.partial_result = None
+            st.rerun()
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        if partial["content"] and st.button("▶️ 이어서 작성", use_container_width=True, type="primary", key="resume_job_btn"):
+            start_job(partial["kind"], partial["label"], partial["payload"], partial=partial["content"])
+    with col2:
+        if st.button("🗑️ 버리기", use_container_width=True, key="discard_partial_btn"):
+            st.session_state.partial_result = None
+            st.rerun()
 
-# PowerPoint 생성 함수
-def create_ppt(content, title):
-    prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(7.5)
-    
-    title_slide_layout = prs.slide_layouts[0]
-    slide = prs.slides.add_slide(title_slide_layout)
-    slide.shapes.title.text = title
-    
-    lines = content.split('\n')
-    current_slide = None
-    current_content = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        if line.startswith('## '):
-            if current_slide and current_content:
-                text_frame = current_slide.placeholders[1].text_frame
-                for content_line in current_content:
-                    p = text_frame.add_paragraph()
-                    p.text = content_line
-                    p.level = 0
-                    p.font.size = PptPt(14)
-            
-            bullet_slide_layout = prs.slide_layouts[1]
-            current_slide = prs.slides.add_slide(bullet_slide_layout)
-            current_slide.shapes.title.text = line.replace('## ', '')
-            current_content = []
-        elif line.startswith('# '):
-            continue
-        elif current_slide:
-            current_content.append(line)
-    
-    if current_slide and current_content:
-        text_frame = current_slide.placeholders[1].text_frame
-        for content_line in current_content:
-            p = text_frame.add_paragraph()
-            p.text = content_line
-            p.level = 0
-            p.font.size = PptPt(14)
-    
-    buffer = BytesIO()
-    prs.save(buffer)
-    buffer.seek(0)
-    return buffer
+# 해당 단계의 GPT 작업 진행/중단 상태 표시
+def show_job_status(kinds):
+    if st.session_state.active_job and st.session_state.active_job["kind"] in kinds:
+        show_active_job()
+    elif st.session_state.partial_result and st.session_state.partial_result["kind"] in kinds:
+        show_partial_result()
 
 # Streamlit UI 시작
 # st.set_page_config(page_title="RAG 기반 산업군 추천 및 분석", layout="wide")
@@ -257,6 +165,10 @@ def initialize_session_state():
         "report_completed": False,
         "generated_file": None,
         "current_section_index": 0,  # 현재 작성 중인 섹션 인덱스
+        "usage_log": [],  # GPT 호출별 토큰 사용량 (프롬프트 캐시 적중 확인용)
+        "active_job": None,  # 진행 중인 GPT 백그라운드 작업
+        "partial_result": None,  # 중단된 GPT 작업의 부분 결과 (이어서 작성용)
+        "section_evidence": [],  # 보고서 섹션별 참고 자료 (보고서 작성 시작 시 검색)
     }
     for key, default in defaults.items():
         if key not in st.session_state:
@@ -264,22 +176,11 @@ def initialize_session_state():
 
 initialize_session_state()
 
-# 보고서 섹션 정의
-REPORT_SECTIONS = [
-    {"title": "산업 개요 및 시장 동향", "description": "산업의 정의, 현황, 최신 트렌드"},
-    {"title": "시장 규모 및 성장 전망", "description": "구체적인 시장 규모 데이터와 성장 예측"},
-    {"title": "주요 경쟁사 분석", "description": "주요 플레이어들의 현황과 포지셔닝"},
-    {"title": "핵심 기술 및 혁신 동향", "description": "기술적 발전과 혁신 사례"},
-    {"title": "타겟 고객 및 시장 세그먼트", "description": "주요 고객층과 시장 세분화"},
-    {"title": "사업 기회 및 진입 전략", "description": "시장 기회와 전략적 접근"},
-    {"title": "리스크 요인 및 대응 방안", "description": "잠재적 위험과 완화 전략"},
-    {"title": "결론 및 향후 전망", "description": "종합 분석과 미래 전망"}
-]
-
 # 초기화 버튼
 with st.sidebar:
     st.header("⚙️ 설정")
     if st.button("🔄 전체 초기화", use_container_width=True):
+        cancel_active_job()
         for key in list(st.session_state.keys()):
             del st.session_state[key]
         st.rerun()
@@ -295,6 +196,16 @@ with st.sidebar:
         st.markdown("**완료된 섹션:**")
         for i, section in enumerate(st.session_state.report_sections):
             st.markdown(f"✅ {i+1}. {section['title']}")
+    
+    # GPT 호출별 프롬프트 캐시 적중 현황
+    if st.session_state.usage_log:
+        st.markdown("---")
+        st.subheader("⚡ 프롬프트 캐시")
+        total_prompt = sum(entry["prompt_tokens"] for entry in st.session_state.usage_log)
+        total_cached = sum(entry["cached_tokens"] for entry in st.session_state.usage_log)
+        st.metric("캐시 적중률", f"{total_cached / total_prompt:.0%}" if total_prompt else "0%")
+        for entry in st.session_state.usage_log:
+            st.caption(f"{entry['label']}: {entry['cached_tokens']:,}/{entry['prompt_tokens']:,} 토큰 캐시")
 
 # 보고서 완료 후 화면
 if st.session_state.report_completed:
@@ -338,30 +249,20 @@ if st.session_state.report_completed:
     with col2:
         if st.button("📄 보고서 파일 생성", use_container_width=True, type="primary", key="generate_file_btn"):
             with st.spinner(f"🔄 {file_format} 파일 생성 중..."):
-                try:
-                    if file_format == "PDF":
-                        file_buffer = create_pdf(st.session_state.report_final, report_title)
-                        mime_type = "application/pdf"
-                        file_ext = "pdf"
-                    elif file_format == "Word":
-                        file_buffer = create_word(st.session_state.report_final, report_title)
-                        mime_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                        file_ext = "docx"
-                    elif file_format == "PowerPoint":
-                        file_buffer = create_ppt(st.session_state.report_final, report_title)
-                        mime_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-                        file_ext = "pptx"
-                    
-                    if file_buffer:
-                        st.session_state.generated_file = {
-                            "buffer": file_buffer,
-                            "mime": mime_type,
-                            "ext": file_ext,
-                            "format": file_format
-                        }
-                        st.success(f"✅ {file_format} 파일 생성 완료!")
-                except Exception as e:
-                    st.error(f"❌ 파일 생성 중 오류 발생: {str(e)}")
+                exported = run_step(
+                    "export", "파일 생성",
+                    content=st.session_state.report_final,
+                    title=report_title,
+                    file_format=file_format
+                )
+                if exported:
+                    st.session_state.generated_file = {
+                        "buffer": base64.b64decode(exported["data"]),
+                        "mime": exported["mime"],
+                        "ext": exported["ext"],
+                        "format": exported["format"]
+                    }
+                    st.success(f"✅ {file_format} 파일 생성 완료!")
     
     if st.session_state.generated_file:
         st.markdown("---")
@@ -384,6 +285,7 @@ if st.session_state.report_completed:
     
     st.markdown("---")
     if st.button("🔄 새로운 분석 시작", use_container_width=True, key="new_analysis_btn"):
+        cancel_active_job()
         for key in list(st.session_state.keys()):
             del st.session_state[key]
         st.rerun()
@@ -410,25 +312,20 @@ if keyword_input != st.session_state.keyword:
     st.session_state.recommendation_list = []
     st.session_state.selected_industry = ""
     st.session_state.chat_history = []
+    # 이전 키워드로 진행 중이던 작업은 더 이상 필요 없으므로 취소
+    cancel_active_job()
+    st.session_state.partial_result = None
+    st.session_state.section_evidence = []
 
 # 2. RAG 검색 수행
 if st.session_state.keyword and not st.session_state.search_results:
     with st.spinner("🔍 RAG 검색 중..."):
-        try:
-            results = search_client.search(st.session_state.keyword, top=5)
-            docs = []
-            result_list = list(results)
-            
-            if not result_list:
+        docs = run_step("search", "검색", keyword=st.session_state.keyword)
+        if docs is not None:
+            if not docs:
                 st.warning("⚠️ 검색 결과가 없습니다. 다른 키워드를 시도해보세요.")
             else:
-                for i, result in enumerate(result_list):
-                    title = result.get("title", f"문서 {i+1}")
-                    chunk = result.get("chunk", "")
-                    docs.append(f"{title}\n{chunk}")
                 st.session_state.search_results = docs
-        except Exception as e:
-            st.error(f"❌ 검색 중 오류 발생: {str(e)}")
 
 # 2-1. RAG 검색 결과 표시
 if st.session_state.search_results:
@@ -443,32 +340,19 @@ if st.session_state.search_results:
             st.markdown(chunk[:500] + "..." if len(chunk) > 500 else chunk)
 
 # 3. GPT 산업군 추천
+# 사전 계산 인덱스/캐시에 있으면 바로 표시하고, 없을 때만 백그라운드 작업으로 GPT 호출 (키워드 변경/초기화 시 취소)
 if st.session_state.search_results and not st.session_state.recommendations_raw:
-    with st.spinner("🤖 GPT가 산업군을 분석 중..."):
-        combined_text = "\n\n".join(st.session_state.search_results)
-        prompt = f"""
-다음은 '{st.session_state.keyword}' 키워드에 대해 검색된 문서 내용입니다:
-
-{combined_text}
-
-이 정보를 바탕으로 관련된 유망 산업군을 5개 추천해 주세요.
-각 산업군은 다음 형식으로 작성해 주세요:
-- 산업군명: 간단한 설명 (1-2문장)
-
-반드시 각 줄은 "산업군명:"으로 시작하고 그 뒤에 설명이 오도록 작성해 주세요.
-        """
-        recommendations = ask_openai(prompt=prompt)
-        if recommendations:
-            st.session_state.recommendations_raw = recommendations
-            recommendation_list = []
-            for line in recommendations.split("\n"):
-                line = line.strip("-• ").strip()
-                if ':' in line and any(c.isalpha() for c in line):
-                    title = line.split(':')[0].strip()
-                    if title:
-                        recommendation_list.append(title)
-            st.session_state.recommendation_list = recommendation_list[:5]
-        st.rerun()
+    if not st.session_state.active_job and not st.session_state.partial_result:
+        cached = run_step("recommend_cached", "추천 결과 조회", keyword=st.session_state.keyword)
+        if cached:
+            st.session_state.recommendations_raw = cached["raw"]
+            st.session_state.recommendation_list = cached["list"]
+            st.rerun()
+        start_job("recommend", "GPT 산업군 추천", {
+            "keyword": st.session_state.keyword,
+            "search_results": st.session_state.search_results
+        })
+    show_job_status(["recommend"])
 
 # 4. 추천 결과 출력 및 산업군 선택
 if st.session_state.recommendation_list:
@@ -489,6 +373,9 @@ if st.session_state.recommendation_list:
     
     if selected != st.session_state.selected_industry:
         st.session_state.selected_industry = selected
+        cancel_active_job()
+        st.session_state.partial_result = None
+        st.session_state.section_evidence = []
         if st.session_state.chat_history:
             if st.checkbox("이전 대화 기록 유지"):
                 pass
@@ -508,22 +395,16 @@ if st.session_state.selected_industry:
     
     col1, col2 = st.columns([1, 5])
     with col1:
-        ask_button = st.button("📤 질문하기", use_container_width=True)
+        ask_button = st.button("📤 질문하기", use_container_width=True, disabled=st.session_state.active_job is not None)
     
     if ask_button and user_question.strip():
-        with st.spinner("🤖 GPT가 답변 생성 중..."):
-            messages = [
-                {"role": "system", "content": f"당신은 '{st.session_state.selected_industry}' 산업군의 시장 분석 전문가입니다."}
-            ]
-            for q, a in st.session_state.chat_history:
-                messages.append({"role": "user", "content": q})
-                messages.append({"role": "assistant", "content": a})
-            messages.append({"role": "user", "content": user_question})
-            
-            answer = ask_openai(messages=messages)
-            if answer:
-                st.session_state.chat_history.append((user_question, answer))
-                st.rerun()
+        start_job("answer", f"Q{len(st.session_state.chat_history) + 1} 질의응답", {
+            "industry": st.session_state.selected_industry,
+            "chat_history": st.session_state.chat_history,
+            "question": user_question
+        })
+    
+    show_job_status(["answer"])
 
 # 6. 대화 기록 출력
 if st.session_state.chat_history:
@@ -557,64 +438,34 @@ if st.session_state.chat_history:
         *{current_section['description']}*
         """)
         
+        if st.session_state.current_section_index < len(st.session_state.section_evidence) and st.session_state.section_evidence[st.session_state.current_section_index]:
+            with st.expander("📚 이 섹션의 참고 자료", expanded=False):
+                st.text(st.session_state.section_evidence[st.session_state.current_section_index])
+        
         # 보고서 작성 시작 또는 계속
         button_label = "📝 보고서 작성 시작" if not st.session_state.report_sections else f"➕ '{current_section['title']}' 섹션 작성"
         
-        if st.button(button_label, use_container_width=True, type="primary"):
-            with st.spinner(f"🔄 '{current_section['title']}' 작성 중..."):
-                # 메시지 구성
-                messages = [
-                    {"role": "system", "content": f"당신은 '{st.session_state.selected_industry}' 산업군에 대한 전문적인 시장 분석 보고서를 작성하는 전문가입니다."}
-                ]
-                
-                # 이전 대화 내역 추가
-                for q, a in st.session_state.chat_history:
-                    messages.append({"role": "user", "content": q})
-                    messages.append({"role": "assistant", "content": a})
-                
-                # 이미 작성된 섹션이 있으면 컨텍스트로 제공
-                if st.session_state.report_sections:
-                    previous_content = "\n\n".join([
-                        f"## {section['title']}\n{section['content']}" 
-                        for section in st.session_state.report_sections
-                    ])
-                    messages.append({
-                        "role": "assistant", 
-                        "content": f"[지금까지 작성된 보고서 내용]\n\n{previous_content}"
-                    })
-                
-                # 현재 섹션 작성 요청
-                section_prompt = f"""
-이제 보고서의 다음 섹션을 작성해주세요:
-
-**섹션 {st.session_state.current_section_index + 1}: {current_section['title']}**
-
-이 섹션에서 다룰 내용: {current_section['description']}
-
-**작성 지침:**
-1. "## {current_section['title']}" 형식으로 섹션 제목을 시작하세요
-2. 이전 섹션들과 자연스럽게 연결되도록 작성하세요
-3. 구체적인 데이터, 사례, 분석을 포함하세요
-4. 전문적이고 설득력 있게 작성하세요
-5. 넘버링이나 리스트를 사용할 때는 일관성을 유지하세요
-6. 마무리 멘트 없이 섹션 내용만 작성하세요
-
-지금까지의 대화 내용과 이전 섹션들을 참고하여 '{current_section['title']}' 섹션을 상세히 작성해주세요.
-"""
-                messages.append({"role": "user", "content": section_prompt})
-                
-                # GPT 호출
-                section_content = ask_openai(messages=messages)
-                
-                if section_content:
-                    # 섹션 저장
-                    st.session_state.report_sections.append({
-                        "title": current_section['title'],
-                        "content": section_content
-                    })
-                    st.session_state.current_section_index += 1
-                    st.success(f"✅ '{current_section['title']}' 섹션 작성 완료!")
-                    st.rerun()
+        if st.button(button_label, use_container_width=True, type="primary", disabled=st.session_state.active_job is not None):
+            # 8개 섹션의 참고 자료를 산업군당 한 번만 동시 검색 (이후 섹션은 저장된 자료 재사용)
+            # 검색에 실패하거나 보고서 작성 도중이면 빈 참고 자료로 고정해, 이미 작성된 섹션의 프롬프트가 바뀌지 않도록 함
+            if not st.session_state.section_evidence:
+                evidence = None
+                if not st.session_state.report_sections:
+                    with st.spinner("📚 섹션별 참고 자료 검색 중..."):
+                        evidence = run_step(
+                            "section_evidence", "검색",
+                            industry=st.session_state.selected_industry
+                        )
+                st.session_state.section_evidence = evidence or [""] * len(REPORT_SECTIONS)
+            start_job("write_section", f"섹션 {st.session_state.current_section_index + 1} '{current_section['title']}' 작성", {
+                "industry": st.session_state.selected_industry,
+                "chat_history": st.session_state.chat_history,
+                "report_sections": st.session_state.report_sections,
+                "section_index": st.session_state.current_section_index,
+                "section_evidence": st.session_state.section_evidence
+            })
+        
+        show_job_status(["write_section"])
     
     # 작성된 보고서 미리보기
     if st.session_state.report_sections:
@@ -623,10 +474,7 @@ if st.session_state.chat_history:
         
         # 전체 보고서 조합
         full_report = f"# {st.session_state.selected_industry} 시장 분석 및 사업 제안 보고서\n\n"
-        full_report += "\n\n".join([
-            f"## {section['title']}\n{section['content']}" 
-            for section in st.session_state.report_sections
-        ])
+        full_report += join_sections(st.session_state.report_sections)
         
         with st.expander("🔍 현재까지 작성된 전체 보고서 보기", expanded=False):
             st.markdown(full_report)
@@ -647,10 +495,7 @@ if st.session_state.chat_history:
                 if st.button("✅ 보고서 최종 완료", use_container_width=True, type="primary"):
                     # 최종 보고서 조합
                     final_report = f"# {st.session_state.selected_industry} 시장 분석 및 사업 제안 보고서\n\n"
-                    final_report += "\n\n".join([
-                        f"## {section['title']}\n{section['content']}" 
-                        for section in st.session_state.report_sections
-                    ])
+                    final_report += join_sections(st.session_state.report_sections)
                     st.session_state.report_final = final_report
                     st.session_state.report_completed = True
                     st.rerun()
@@ -687,107 +532,31 @@ if st.session_state.chat_history:
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                if st.button("✅ 수정 적용", use_container_width=True, type="primary", disabled=not modification_instruction.strip()):
-                    with st.spinner(f"🔄 '{st.session_state.report_sections[section_to_edit]['title']}' 수정 중..."):
-                        selected_section = REPORT_SECTIONS[section_to_edit]
-                        
-                        messages = [
-                            {"role": "system", "content": f"당신은 '{st.session_state.selected_industry}' 산업군에 대한 전문적인 시장 분석 보고서를 작성하는 전문가입니다."}
-                        ]
-                        
-                        for q, a in st.session_state.chat_history:
-                            messages.append({"role": "user", "content": q})
-                            messages.append({"role": "assistant", "content": a})
-                        
-                        # 이전/이후 섹션 컨텍스트 제공
-                        context_sections = []
-                        if section_to_edit > 0:
-                            context_sections.append(f"[이전 섹션]\n## {st.session_state.report_sections[section_to_edit-1]['title']}\n{st.session_state.report_sections[section_to_edit-1]['content']}")
-                        if section_to_edit < len(st.session_state.report_sections) - 1:
-                            context_sections.append(f"[다음 섹션]\n## {st.session_state.report_sections[section_to_edit+1]['title']}\n{st.session_state.report_sections[section_to_edit+1]['content']}")
-                        
-                        if context_sections:
-                            messages.append({"role": "assistant", "content": "\n\n".join(context_sections)})
-                        
-                        rewrite_prompt = f"""
-다음 섹션을 사용자의 요청에 따라 수정해주세요.
-
-**섹션명:** {selected_section['title']}
-
-**현재 내용:**
-{st.session_state.report_sections[section_to_edit]['content']}
-
-**사용자 수정 요청:**
-{modification_instruction}
-
-**작성 지침:**
-1. "## {selected_section['title']}" 형식으로 섹션 제목을 시작하세요
-2. 사용자의 수정 요청사항을 정확히 반영하세요
-3. 이전/다음 섹션과 자연스럽게 연결되도록 작성하세요
-4. 기존 내용의 장점은 유지하면서 요청사항만 개선하세요
-5. 넘버링과 스타일을 일관성 있게 유지하세요
-6. 마무리 멘트 없이 섹션 내용만 작성하세요
-
-사용자의 요청을 반영하여 '{selected_section['title']}' 섹션을 수정해주세요.
-"""
-                        messages.append({"role": "user", "content": rewrite_prompt})
-                        
-                        new_content = ask_openai(messages=messages)
-                        if new_content:
-                            st.session_state.report_sections[section_to_edit]['content'] = new_content
-                            st.session_state.editing_mode = False
-                            st.success(f"✅ '{selected_section['title']}' 섹션이 수정되었습니다!")
-                            st.rerun()
+                if st.button("✅ 수정 적용", use_container_width=True, type="primary", disabled=not modification_instruction.strip() or st.session_state.active_job is not None):
+                    start_job("revise_section", f"섹션 {section_to_edit + 1} '{st.session_state.report_sections[section_to_edit]['title']}' 수정", {
+                        "industry": st.session_state.selected_industry,
+                        "chat_history": st.session_state.chat_history,
+                        "report_sections": st.session_state.report_sections,
+                        "section_index": section_to_edit,
+                        "instruction": modification_instruction,
+                        "section_evidence": st.session_state.section_evidence
+                    })
             
             with col2:
-                if st.button("🔄 완전 재작성", use_container_width=True):
-                    with st.spinner(f"🔄 '{st.session_state.report_sections[section_to_edit]['title']}' 완전 재작성 중..."):
-                        selected_section = REPORT_SECTIONS[section_to_edit]
-                        
-                        messages = [
-                            {"role": "system", "content": f"당신은 '{st.session_state.selected_industry}' 산업군에 대한 전문적인 시장 분석 보고서를 작성하는 전문가입니다."}
-                        ]
-                        
-                        for q, a in st.session_state.chat_history:
-                            messages.append({"role": "user", "content": q})
-                            messages.append({"role": "assistant", "content": a})
-                        
-                        # 이전 섹션들 컨텍스트
-                        if section_to_edit > 0:
-                            previous_content = "\n\n".join([
-                                f"## {section['title']}\n{section['content']}" 
-                                for i, section in enumerate(st.session_state.report_sections) 
-                                if i < section_to_edit
-                            ])
-                            messages.append({"role": "assistant", "content": f"[이전 섹션들]\n\n{previous_content}"})
-                        
-                        rewrite_prompt = f"""
-'{selected_section['title']}' 섹션을 처음부터 다시 작성해주세요.
-
-**섹션 설명:** {selected_section['description']}
-
-{f"**사용자 추가 요청:**\n{modification_instruction}\n" if modification_instruction.strip() else ""}
-
-**작성 지침:**
-1. "## {selected_section['title']}" 형식으로 섹션 제목을 시작하세요
-2. 이전 섹션들과 자연스럽게 연결되도록 작성하세요
-3. 구체적인 데이터, 사례, 분석을 포함하세요
-4. 전문적이고 설득력 있게 작성하세요
-5. 넘버링과 스타일을 일관성 있게 유지하세요
-6. 마무리 멘트 없이 섹션 내용만 작성하세요
-
-'{selected_section['title']}' 섹션을 새롭게 작성해주세요.
-"""
-                        messages.append({"role": "user", "content": rewrite_prompt})
-                        
-                        new_content = ask_openai(messages=messages)
-                        if new_content:
-                            st.session_state.report_sections[section_to_edit]['content'] = new_content
-                            st.session_state.editing_mode = False
-                            st.success(f"✅ '{selected_section['title']}' 섹션이 재작성되었습니다!")
-                            st.rerun()
+                if st.button("🔄 완전 재작성", use_container_width=True, disabled=st.session_state.active_job is not None):
+                    start_job("rewrite_section", f"섹션 {section_to_edit + 1} '{st.session_state.report_sections[section_to_edit]['title']}' 재작성", {
+                        "industry": st.session_state.selected_industry,
+                        "chat_history": st.session_state.chat_history,
+                        "report_sections": st.session_state.report_sections,
+                        "section_index": section_to_edit,
+                        "instruction": modification_instruction,
+                        "section_evidence": st.session_state.section_evidence
+                    })
             
             with col3:
                 if st.button("❌ 수정 취소", use_container_width=True):
+                    cancel_active_job()
                     st.session_state.editing_mode = False
-                    st.rerun()
\ No newline at end of file
+                    st.rerun()
+            
+            show_job_status(["revise_section", "rewrite_section"])
\ No newline at end of file
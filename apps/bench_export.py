@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from exporters import EXPORT_FORMATS
+from sections import REPORT_SECTIONS, join_sections
+
+# 보고서 파일 생성 벤치마크
+# 섹션당 글자 수를 늘려가며 8개 섹션 보고서를 합성하고, 형식별 소요 시간/최대 메모리/파일 크기를 측정한다.
+# --save 로 기준값을 저장하고 --compare 로 기준값 대비 허용 범위를 넘으면 실패(종료 코드 1) 처리한다.
+
+DEFAULT_SIZES = [1000, 5000, 20000, 50000]
+
+WORDS = [
+    "시장", "산업", "성장", "기술", "혁신", "고객", "전략", "경쟁사", "플랫폼", "데이터",
+    "인공지능", "클라우드", "반도체", "배터리", "규제", "투자", "수요", "공급망", "생태계", "서비스",
+    "매출", "점유율", "파트너십", "전망", "리스크", "글로벌", "국내", "2025년", "CAGR", "15.3%",
+]
+
+
+def _sentence(rng, min_words=8, max_words=20):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))) + "입니다."
+
+
+# 섹션 본문 합성 (문단, 글머리/번호 목록, 공백 없는 긴 줄을 섞어 target_chars 글자 이상 생성)
+def synthesize_section(rng, target_chars):
+    lines = []
+    length = 0
+    while length < target_chars:
+        kind = rng.random()
+        if kind < 0.5:
+            block = [" ".join(_sentence(rng) for _ in range(rng.randint(2, 5)))]
+        elif kind < 0.7:
+            block = [f"- **{rng.choice(WORDS)}**: {_sentence(rng)}" for _ in range(rng.randint(3, 7))]
+        elif kind < 0.9:
+            block = [f"{i}. {_sentence(rng)}" for i in range(1, rng.randint(3, 7))]
+        else:
+            # 줄바꿈 기회가 없는 긴 한글 줄 (wordWrap='CJK' 처리 부담)
+            block = ["".join(rng.choice(WORDS) for _ in range(rng.randint(60, 120)))]
+        lines.extend(block + [""])
+        length += sum(len(line) for line in block)
+    return "\n".join(lines)
+
+
+def synthesize_report(section_chars, seed=0):
+    rng = random.Random(seed)
+    sections = [
+        {"title": section["title"], "content": synthesize_section(rng, section_chars)}
+        for section in REPORT_SECTIONS
+    ]
+    return "# 벤치마크 산업 시장 분석 및 사업 제안 보고서\n\n" + join_sections(sections)
+
+
+# 형식 하나, 크기 하나 측정 (시간은 repeat 회 중앙값, 메모리는 별도 1회 측정)
+def measure(file_format, content, repeat):
+    create = EXPORT_FORMATS[file_format][0]
+    title = "벤치마크 보고서"
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        buffer = create(content, title)
+        timings.append(time.perf_counter() - start)
+    output_bytes = len(buffer.getvalue())
+
+    tracemalloc.start()
+    create(content, title)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": statistics.median(timings),
+        "peak_memory_bytes": peak,
+        "output_bytes": output_bytes,
+    }
+
+
+def run(formats, sizes, repeat):
+    results = {}
+    for section_chars in sizes:
+        content = synthesize_report(section_chars)
+        for file_format in formats:
+            key = f"{file_format}:{section_chars}"
+            results[key] = measure(file_format, content, repeat)
+            result = results[key]
+            print(f"{file_format:<11}{section_chars:>8,}자/섹션  {result['seconds']:>8.3f}초  "
+                  f"{result['peak_memory_bytes'] / 2**20:>8.1f}MB  {result['output_bytes'] / 2**10:>9.1f}KB")
+    return results
+
+
+# 기준값 대비 비교 (시간/메모리/파일 크기가 허용 비율 이상 늘어나면 회귀로 판단)
+# 기준값에 없는 측정 항목은 비교할 수 없으므로 따로 반환한다.
+def compare(results, baseline, tolerance):
+    regressions = []
+    missing = []
+    for key, result in results.items():
+        expected = baseline["results"].get(key)
+        if expected is None:
+            missing.append(key)
+            continue
+        for metric in ("seconds", "peak_memory_bytes", "output_bytes"):
+            if expected[metric] and result[metric] > expected[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {expected[metric]:,.3f} → {result[metric]:,.3f} "
+                                   f"(+{result[metric] / expected[metric] - 1:.0%})")
+    return regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보고서 파일 생성(PDF/Word/PowerPoint) 벤치마크")
+    parser.add_argument("--formats", nargs="+", default=list(EXPORT_FORMATS), choices=list(EXPORT_FORMATS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="섹션당 글자 수")
+    parser.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수")
+    parser.add_argument("--save", help="측정 결과를 기준값으로 저장할 경로")
+    parser.add_argument("--compare", help="비교할 기준값 경로")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="허용 증가 비율 (기본값: 0.3 = 30%%)")
+    args = parser.parse_args()
+
+    save_path = os.path.abspath(args.save) if args.save else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    # 폰트(fonts/)를 앱 실행 시와 같은 경로에서 찾도록 작업 디렉터리 고정
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    results = run(args.formats, args.sizes, args.repeat)
+
+    if save_path:
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {save_path}")
+
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, current in (("python", platform.python_version()), ("platform", platform.platform())):
+            if baseline.get(name) != current:
+                print(f"⚠️ 기준값과 측정 환경이 다릅니다 ({name}: {baseline.get(name)} → {current})")
+        regressions, missing = compare(results, baseline, args.tolerance)
+        if missing:
+            print(f"❌ 기준값에 없는 측정 항목 {len(missing)}건 (--formats/--sizes 를 기준값과 맞춰주세요): {', '.join(missing)}")
+            sys.exit(1)
+        if regressions:
+            print(f"❌ 기준값 대비 성능 저하 {len(regressions)}건:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("✅ 기준값 대비 성능 저하 없음")
+
+
+if __name__ == "__main__":
+    main()
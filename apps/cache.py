@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+
+# 공유 데이터 디렉터리 (여러 인스턴스가 같은 경로를 마운트하면 캐시와 작업 큐를 공유)
+DATA_DIR = os.getenv(
+    "PIPELINE_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pipeline")
+)
+CACHE_TTL = int(os.getenv("PIPELINE_CACHE_TTL", str(24 * 60 * 60)))
+
+
+# JSON 파일 원자적 저장 (임시 파일 작성 후 교체)
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+
+def _cache_path(namespace, key):
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, namespace, f"{digest}.json")
+
+
+# 캐시 조회 (만료되었거나 없으면 None)
+def get(namespace, key, ttl=CACHE_TTL):
+    entry = read_json(_cache_path(namespace, key))
+    if entry is None:
+        return None
+    if ttl and time.time() - entry["saved_at"] > ttl:
+        return None
+    return entry["value"]
+
+
+def set(namespace, key, value):
+    write_json(_cache_path(namespace, key), {"saved_at": time.time(), "value": value})
+
+
+# 캐시에 없으면 계산 후 저장
+def get_or_compute(namespace, key, compute, ttl=CACHE_TTL):
+    value = get(namespace, key, ttl=ttl)
+    if value is None:
+        value = compute()
+        if value:
+            set(namespace, key, value)
+    return value
+
+
+# 만료된 캐시 파일 삭제 (저장 시각 대신 파일 수정 시각으로 판단해 파일을 읽지 않음)
+def cleanup(ttl=CACHE_TTL):
+    now = time.time()
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if now - os.path.getmtime(path) > ttl:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
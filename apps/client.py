@@ -0,0 +1,109 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import jobs
+
+# PIPELINE_API_URL 이 설정되면 API 서버(워커 풀)에 작업을 맡기고, 없으면 현재 프로세스에서 직접 실행
+PIPELINE_API_URL = os.getenv("PIPELINE_API_URL", "").rstrip("/")
+# API 서버와 공유하는 인증 토큰 (api.py 의 PIPELINE_API_TOKEN 과 같은 값)
+PIPELINE_API_TOKEN = os.getenv("PIPELINE_API_TOKEN", "")
+POLL_INTERVAL = float(os.getenv("PIPELINE_POLL_INTERVAL", "0.5"))
+REQUEST_TIMEOUT = 30
+# API 모드에서 작업 완료를 기다리는 최대 시간(초)
+RUN_TIMEOUT = float(os.getenv("PIPELINE_RUN_TIMEOUT", "600"))
+# 로컬 실행 시 백그라운드 작업 스레드 수
+LOCAL_WORKERS = int(os.getenv("PIPELINE_LOCAL_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=LOCAL_WORKERS)
+
+
+class PipelineError(Exception):
+    pass
+
+
+def _request(method, path, data=None):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8") if data is not None else None
+    headers = {"Content-Type": "application/json"}
+    if PIPELINE_API_TOKEN:
+        headers["X-Pipeline-Token"] = PIPELINE_API_TOKEN
+    request = urllib.request.Request(
+        f"{PIPELINE_API_URL}{path}",
+        data=body,
+        method=method,
+        headers=headers
+    )
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        return json.loads(response.read())
+
+
+# 작업 실행 후 결과 반환 (API 모드에서는 완료될 때까지 폴링)
+def run(kind, **payload):
+    if not PIPELINE_API_URL:
+        import pipeline
+        jobs.housekeeping()
+        try:
+            return pipeline.run_step(kind, payload)
+        except Exception as e:
+            raise PipelineError(str(e)) from e
+
+    job_id = _request("POST", "/jobs", {"kind": kind, "payload": payload})["job_id"]
+    deadline = time.monotonic() + RUN_TIMEOUT
+    while True:
+        job = _request("GET", f"/jobs/{job_id}")
+        if job["status"] in jobs.FINISHED_STATUSES:
+            # 결과를 받았으면 공유 저장소에서 바로 삭제 (실패해도 보관 기간이 지나면 정리됨)
+            try:
+                _request("DELETE", f"/jobs/{job_id}")
+            except Exception:
+                pass
+            if job["status"] == jobs.STATUS_DONE:
+                return job["result"]
+            raise PipelineError(job["error"] or "작업이 취소되었습니다.")
+        if time.monotonic() > deadline:
+            _request("DELETE", f"/jobs/{job_id}")
+            raise PipelineError(f"작업이 제한 시간({RUN_TIMEOUT:.0f}초) 안에 끝나지 않았습니다.")
+        time.sleep(POLL_INTERVAL)
+
+
+# 백그라운드 작업 등록 후 작업 ID 반환 (로컬 실행 시 현재 프로세스의 스레드에서 처리)
+def submit(kind, **payload):
+    if PIPELINE_API_URL:
+        return _request("POST", "/jobs", {"kind": kind, "payload": payload})["job_id"]
+
+    import worker
+    jobs.housekeeping()
+    job_id = jobs.submit(kind, payload, enqueue=False)
+    # 스레드가 작업을 꺼내 처리를 시작할 때까지는 대기 상태로 둔다
+    _executor.submit(worker.process, job_id)
+    return job_id
+
+
+# 작업 상태, 결과 및 스트리밍 중인 부분 결과 조회 (없는 작업이면 None)
+def get(job_id):
+    if PIPELINE_API_URL:
+        try:
+            return _request("GET", f"/jobs/{job_id}")
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+    return jobs.get(job_id)
+
+
+# 작업 취소 요청
+def cancel(job_id):
+    if PIPELINE_API_URL:
+        _request("DELETE", f"/jobs/{job_id}")
+    else:
+        jobs.cancel(job_id)
+
+
+# 결과를 반영한 작업 삭제 (API 는 끝난 작업에 대한 DELETE 를 삭제로 처리)
+def discard(job_id):
+    if PIPELINE_API_URL:
+        _request("DELETE", f"/jobs/{job_id}")
+    else:
+        jobs.discard(job_id)
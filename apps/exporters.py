@@ -0,0 +1,179 @@
+import logging
+from io import BytesIO
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from docx import Document
+from docx.shared import Pt, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from pptx import Presentation
+from pptx.util import Inches, Pt as PptPt
+
+logger = logging.getLogger(__name__)
+
+# PDF 생성 함수
+def create_pdf(content, title):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+
+    # 한글 폰트 등록
+    try:
+        pdfmetrics.registerFont(TTFont('NanumGothic', 'NanumGothic-Regular.ttf'))
+        pdfmetrics.registerFont(TTFont('NanumGothic-Bold', 'NanumGothic-Bold.ttf'))
+        pdfmetrics.registerFont(TTFont('NanumGothic-ExtraBold', 'NanumGothic-ExtraBold.ttf'))
+        font_normal = 'NanumGothic'
+        font_bold = 'NanumGothic-Bold'
+        font_extra_bold = 'NanumGothic-ExtraBold'
+    except Exception as e:
+        logger.warning(f"한글 폰트 로딩 실패: {str(e)}. 기본 폰트를 사용합니다.")
+        font_normal = 'Helvetica'
+        font_bold = 'Helvetica-Bold'
+        font_extra_bold = 'Helvetica-Bold'
+
+    styles = getSampleStyleSheet()
+
+    # 커스텀 스타일 정의
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor='blue',
+        spaceAfter=30,
+        alignment=1,
+        fontName=font_extra_bold,
+        leading=30
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=12,
+        spaceBefore=20,
+        fontName=font_bold,
+        leading=20
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CustomBody',
+        parent=styles['BodyText'],
+        fontSize=11,
+        spaceAfter=12,
+        fontName=font_normal,
+        leading=18,
+        wordWrap='CJK'
+    ))
+
+    story = []
+    story.append(Paragraph(title, styles['CustomTitle']))
+    story.append(Spacer(1, 0.5*inch))
+
+    lines = content.split('\n')
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('## '):
+            story.append(Spacer(1, 0.3*inch))
+            story.append(Paragraph(line.replace('## ', ''), styles['CustomHeading']))
+        elif line.startswith('# '):
+            continue
+        else:
+            story.append(Paragraph(line, styles['CustomBody']))
+
+    doc.build(story)
+
+    buffer.seek(0)
+    return buffer
+
+# Word 생성 함수
+def create_word(content, title):
+    doc = Document()
+
+    title_para = doc.add_heading(title, level=0)
+    title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title_run = title_para.runs[0]
+    title_run.font.size = Pt(24)
+    title_run.font.color.rgb = RGBColor(0, 112, 192)
+
+    doc.add_paragraph()
+
+    lines = content.split('\n')
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('## '):
+            doc.add_heading(line.replace('## ', ''), level=1)
+        elif line.startswith('# '):
+            continue
+        else:
+            para = doc.add_paragraph(line)
+            para.style.font.size = Pt(11)
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+# PowerPoint 생성 함수
+def create_ppt(content, title):
+    prs = Presentation()
+    prs.slide_width = Inches(10)
+    prs.slide_height = Inches(7.5)
+
+    title_slide_layout = prs.slide_layouts[0]
+    slide = prs.slides.add_slide(title_slide_layout)
+    slide.shapes.title.text = title
+
+    lines = content.split('\n')
+    current_slide = None
+    current_content = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('## '):
+            if current_slide and current_content:
+                text_frame = current_slide.placeholders[1].text_frame
+                for content_line in current_content:
+                    p = text_frame.add_paragraph()
+                    p.text = content_line
+                    p.level = 0
+                    p.font.size = PptPt(14)
+
+            bullet_slide_layout = prs.slide_layouts[1]
+            current_slide = prs.slides.add_slide(bullet_slide_layout)
+            current_slide.shapes.title.text = line.replace('## ', '')
+            current_content = []
+        elif line.startswith('# '):
+            continue
+        elif current_slide:
+            current_content.append(line)
+
+    if current_slide and current_content:
+        text_frame = current_slide.placeholders[1].text_frame
+        for content_line in current_content:
+            p = text_frame.add_paragraph()
+            p.text = content_line
+            p.level = 0
+            p.font.size = PptPt(14)
+
+    buffer = BytesIO()
+    prs.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+# 파일 형식별 생성 함수, MIME 타입, 확장자
+EXPORT_FORMATS = {
+    "PDF": (create_pdf, "application/pdf", "pdf"),
+    "Word": (create_word, "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+    "PowerPoint": (create_ppt, "application/vnd.openxmlformats-officedocument.presentationml.presentation", "pptx"),
+}
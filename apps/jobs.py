@@ -0,0 +1,299 @@
+import logging
+import os
+import time
+import uuid
+import cache
+from cache import DATA_DIR, write_json, read_json
+
+# 파일 기반 작업 큐
+# - jobs/<id>.json : 작업 상태 및 결과
+# - queue/<id>     : 대기 중인 작업 (워커가 claimed/ 로 이동시켜 선점)
+# - partial/<id>   : 스트리밍 중인 GPT 응답 (취소/시간 초과 후에도 보존)
+# - cancel/<id>    : 취소 요청 표시
+JOBS_DIR = os.path.join(DATA_DIR, "jobs")
+QUEUE_DIR = os.path.join(DATA_DIR, "queue")
+CLAIMED_DIR = os.path.join(DATA_DIR, "claimed")
+PARTIAL_DIR = os.path.join(DATA_DIR, "partial")
+CANCEL_DIR = os.path.join(DATA_DIR, "cancel")
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+# 중단된 부분 결과에 이어서 작성할 수 있는 작업 종류 (pipeline.MESSAGE_BUILDERS 와 같아야 함)
+RESUMABLE_KINDS = ("answer", "write_section", "revise_section", "rewrite_section")
+
+logger = logging.getLogger(__name__)
+
+# 부분 결과 기록 및 취소 확인 간격(초)
+FLUSH_INTERVAL = 0.5
+# 선점된 작업이 이 시간(초) 동안 아무 진행 기록이 없으면 워커가 죽은 것으로 보고 실패 처리
+JOB_TIMEOUT = float(os.getenv("PIPELINE_JOB_TIMEOUT", "600"))
+# 끝난 작업(결과, 부분 결과 포함)을 보관하는 시간(초)
+JOB_TTL = float(os.getenv("PIPELINE_JOB_TTL", "3600"))
+# 멈춘 작업/오래된 파일 정리 주기(초)
+HOUSEKEEPING_INTERVAL = 60
+
+_last_housekeeping = {"at": None}
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _partial_path(job_id):
+    return os.path.join(PARTIAL_DIR, f"{job_id}.txt")
+
+
+def _cancel_path(job_id):
+    return os.path.join(CANCEL_DIR, job_id)
+
+
+def _update(job_id, **fields):
+    job = read_json(_job_path(job_id))
+    if job is None:
+        return None
+    job.update(fields)
+    job["updated_at"] = time.time()
+    write_json(_job_path(job_id), job)
+    return job
+
+
+# 작업 등록 (enqueue=False 이면 큐에 넣지 않고 호출한 프로세스가 직접 실행)
+def submit(kind, payload, enqueue=True):
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    write_json(_job_path(job_id), {
+        "id": job_id,
+        "kind": kind,
+        "payload": payload,
+        "status": STATUS_QUEUED,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    })
+    if not enqueue:
+        return job_id
+    os.makedirs(QUEUE_DIR, exist_ok=True)
+    # 파일명 앞에 등록 시각을 붙여 먼저 들어온 작업부터 처리
+    open(os.path.join(QUEUE_DIR, f"{now:.6f}-{job_id}"), "w").close()
+    return job_id
+
+
+# 작업 조회 (스트리밍 중인 부분 결과 포함)
+def get(job_id):
+    job = read_json(_job_path(job_id))
+    if job is not None:
+        try:
+            with open(_partial_path(job_id), encoding="utf-8") as f:
+                job["partial"] = f.read()
+        except FileNotFoundError:
+            job["partial"] = ""
+    return job
+
+
+# 작업을 실행 상태로 전환 (워커가 실제로 처리를 시작할 때 호출)
+def start(job_id):
+    return _update(job_id, status=STATUS_RUNNING)
+
+
+# 대기 중인 작업 하나를 선점하고 작업 ID 반환 (rename 은 원자적이므로 여러 워커가 동시에 호출해도 한 곳만 성공)
+def claim():
+    os.makedirs(CLAIMED_DIR, exist_ok=True)
+    try:
+        entries = sorted(os.listdir(QUEUE_DIR))
+    except FileNotFoundError:
+        return None
+    for entry in entries:
+        claimed_path = os.path.join(CLAIMED_DIR, entry)
+        try:
+            os.rename(os.path.join(QUEUE_DIR, entry), claimed_path)
+        except FileNotFoundError:
+            continue
+        # 선점 시각을 기록해 오래 대기한 작업이 곧바로 멈춘 작업으로 판단되지 않도록 함
+        os.utime(claimed_path)
+        job_id = entry.split("-", 1)[1]
+        if read_json(_job_path(job_id)) is None:
+            # 대기 중 정리된 작업
+            _release(job_id)
+            continue
+        return job_id
+    return None
+
+
+# 작업 취소 요청 (대기 중이면 바로 취소, 실행 중이면 워커가 다음 확인 시점에 중단)
+def cancel(job_id):
+    os.makedirs(CANCEL_DIR, exist_ok=True)
+    open(_cancel_path(job_id), "w").close()
+    # 큐를 거치지 않는 작업(로컬 실행)도 처리 시작 전이면 바로 취소 상태로 표시
+    job = read_json(_job_path(job_id))
+    if job and job["status"] == STATUS_QUEUED:
+        _update(job_id, status=STATUS_CANCELLED)
+    try:
+        entries = os.listdir(QUEUE_DIR)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.endswith(f"-{job_id}"):
+            try:
+                os.remove(os.path.join(QUEUE_DIR, entry))
+            except FileNotFoundError:
+                return
+            _update(job_id, status=STATUS_CANCELLED)
+
+
+def is_cancelled(job_id):
+    return os.path.exists(_cancel_path(job_id))
+
+
+def _release(job_id):
+    try:
+        entries = os.listdir(CLAIMED_DIR)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.endswith(f"-{job_id}"):
+            try:
+                os.remove(os.path.join(CLAIMED_DIR, entry))
+            except FileNotFoundError:
+                pass
+
+
+def complete(job_id, result):
+    _release(job_id)
+    return _update(job_id, status=STATUS_DONE, result=result)
+
+
+def fail(job_id, error):
+    _release(job_id)
+    return _update(job_id, status=STATUS_FAILED, error=error)
+
+
+def mark_cancelled(job_id):
+    _release(job_id)
+    return _update(job_id, status=STATUS_CANCELLED)
+
+
+# 마지막 진행 시각 (상태 변경, 선점, 부분 결과 기록 중 가장 최근)
+def _last_activity(job, claimed_path):
+    last = job["updated_at"]
+    for path in (claimed_path, _partial_path(job["id"])):
+        try:
+            last = max(last, os.path.getmtime(path))
+        except FileNotFoundError:
+            pass
+    return last
+
+
+# 선점 후 멈춘 작업 정리 (워커 프로세스가 죽으면 claimed/ 에 남은 작업이 계속 실행 중으로 보이므로 실패 처리)
+# GPT 호출이 중복 과금되지 않도록 다시 큐에 넣지는 않는다.
+def reap_stale(timeout=JOB_TIMEOUT):
+    try:
+        entries = os.listdir(CLAIMED_DIR)
+    except FileNotFoundError:
+        return
+    now = time.time()
+    for entry in entries:
+        claimed_path = os.path.join(CLAIMED_DIR, entry)
+        job_id = entry.split("-", 1)[1]
+        job = read_json(_job_path(job_id))
+        if job is None or job["status"] in FINISHED_STATUSES:
+            _release(job_id)
+        elif now - _last_activity(job, claimed_path) > timeout:
+            logger.warning(f"응답 없는 작업 실패 처리: {job_id} ({job['kind']})")
+            fail(job_id, "작업을 처리하던 워커가 응답하지 않아 중단되었습니다.")
+
+
+# 작업 삭제 (작업 파일, 부분 결과, 취소 표시)
+def discard(job_id):
+    for path in (_job_path(job_id), _partial_path(job_id), _cancel_path(job_id)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_older_than(directory, ttl, now):
+    try:
+        entries = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        path = os.path.join(directory, entry)
+        try:
+            if now - os.path.getmtime(path) > ttl:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# 끝난 지 ttl 이 지난 작업 삭제
+# 실행 중인 채로 남은 작업(로컬 실행 중 프로세스 종료 등)은 JOB_TIMEOUT 만큼 더 기다린 뒤 삭제한다.
+def cleanup(ttl=JOB_TTL):
+    now = time.time()
+    try:
+        entries = os.listdir(JOBS_DIR)
+    except FileNotFoundError:
+        entries = []
+    for entry in entries:
+        if not entry.endswith(".json"):
+            continue
+        job = read_json(os.path.join(JOBS_DIR, entry))
+        if job is None:
+            continue
+        age = now - job["updated_at"]
+        if age > ttl and (job["status"] in FINISHED_STATUSES or age > ttl + JOB_TIMEOUT):
+            discard(job["id"])
+    # 작업 파일이 지워진 뒤 남은 부분 결과/취소 표시, 중단된 저장의 임시 파일
+    for directory in (PARTIAL_DIR, CANCEL_DIR):
+        _remove_older_than(directory, ttl + JOB_TIMEOUT, now)
+    for entry in entries:
+        if entry.endswith(".tmp"):
+            try:
+                if now - os.path.getmtime(os.path.join(JOBS_DIR, entry)) > ttl:
+                    os.remove(os.path.join(JOBS_DIR, entry))
+            except FileNotFoundError:
+                pass
+
+
+# 멈춘 작업 실패 처리 및 오래된 작업/캐시 파일 삭제 (HOUSEKEEPING_INTERVAL 마다 한 번)
+def housekeeping():
+    if _last_housekeeping["at"] is not None and time.monotonic() - _last_housekeeping["at"] < HOUSEKEEPING_INTERVAL:
+        return
+    _last_housekeeping["at"] = time.monotonic()
+    try:
+        reap_stale()
+        cleanup()
+        cache.cleanup()
+    except OSError:
+        logger.exception("작업/캐시 정리 중 오류 발생")
+
+
+# 실행 중인 작업의 부분 결과 기록 및 취소 확인 (파일 접근은 FLUSH_INTERVAL 마다 한 번)
+class JobProgress:
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._buffer = []
+        self._cancelled = is_cancelled(job_id)
+        self._last_flush = time.monotonic()
+
+    def append(self, text):
+        self._buffer.append(text)
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            os.makedirs(PARTIAL_DIR, exist_ok=True)
+            with open(_partial_path(self.job_id), "a", encoding="utf-8") as f:
+                f.write("".join(self._buffer))
+            self._buffer = []
+        self._cancelled = is_cancelled(self.job_id)
+        self._last_flush = time.monotonic()
+
+    def cancelled(self):
+        return self._cancelled
@@ -0,0 +1,447 @@
+import base64
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from azure.search.documents import SearchClient
+from azure.core.credentials import AzureKeyCredential
+from openai import AzureOpenAI, APITimeoutError
+from dotenv import load_dotenv
+import cache
+import recommend_index
+from recommend_index import normalize_keyword
+from exporters import EXPORT_FORMATS
+from sections import REPORT_SECTIONS, join_sections
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 로드
+load_dotenv()
+
+# Azure 설정
+SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
+SEARCH_KEY = os.getenv("AZURE_SEARCH_KEY")
+SEARCH_INDEX = os.getenv("AZURE_SEARCH_INDEX")
+OPENAI_API_KEY = os.getenv("AZURE_OPENAI_KEY")
+OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT")
+OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+
+# GPT 호출 1회당 최대 소요 시간(초)
+GPT_TIMEOUT = float(os.getenv("GPT_TIMEOUT", "120"))
+
+# 보고서 공통 시스템 프롬프트 (산업군 등 호출마다 달라지는 내용을 넣지 않아야 프롬프트 캐시 접두부가 유지됨)
+REPORT_SYSTEM_PROMPT = """당신은 산업군별 시장 분석 및 사업 제안 보고서를 작성하는 전문가입니다.
+분석 대상 산업군은 다음 메시지로 안내됩니다. 사용자의 질문에는 해당 산업군의 시장 분석 전문가로서 답변하고,
+보고서 섹션 작성 및 수정 요청에는 아래 지침을 따르세요.
+
+**보고서 구성:**
+""" + "\n".join(
+    f"{i+1}. {section['title']}: {section['description']}"
+    for i, section in enumerate(REPORT_SECTIONS)
+) + """
+
+**작성 지침:**
+1. "## 섹션명" 형식으로 섹션 제목을 시작하세요
+2. 이전 섹션들과 자연스럽게 연결되도록 작성하세요
+3. 구체적인 데이터, 사례, 분석을 포함하세요
+4. 전문적이고 설득력 있게 작성하세요
+5. 넘버링이나 리스트를 사용할 때는 일관성을 유지하세요
+6. 마무리 멘트 없이 섹션 내용만 작성하세요
+"""
+
+# 클라이언트 초기화 (프로세스당 1회)
+@lru_cache(maxsize=None)
+def get_search_client():
+    return SearchClient(
+        endpoint=SEARCH_ENDPOINT,
+        index_name=SEARCH_INDEX,
+        credential=AzureKeyCredential(SEARCH_KEY)
+    )
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    return AzureOpenAI(
+        api_key=OPENAI_API_KEY,
+        api_version="2024-12-01-preview",
+        azure_endpoint=OPENAI_ENDPOINT
+    )
+
+# 토큰 사용량 요약 (cached_tokens: 프롬프트 캐시로 재사용된 접두부 토큰 수)
+def _usage_summary(usage):
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        "completion_tokens": usage.completion_tokens,
+    }
+
+class JobCancelled(Exception):
+    def __init__(self, partial):
+        super().__init__("작업이 취소되었습니다.")
+        self.partial = partial
+
+class DeadlineExceeded(Exception):
+    def __init__(self, timeout, partial):
+        super().__init__(f"GPT 응답 시간이 제한({timeout}초)을 초과했습니다.")
+        self.partial = partial
+
+# GPT 호출 (응답을 스트리밍으로 받아 내용과 토큰 사용량 반환)
+# progress 가 주어지면 받은 내용을 부분 결과로 기록하고, 취소 요청이 있으면 즉시 중단한다.
+def chat_completion(messages, progress=None, timeout=GPT_TIMEOUT):
+    # GPT_TIMEOUT 이 호출 전체의 상한이 되도록 SDK 재시도를 끄고, 스트리밍 중에는 남은 시간이 지나면 연결을 닫는다
+    deadline = time.monotonic() + timeout
+    try:
+        stream = get_openai_client().with_options(timeout=timeout, max_retries=0).chat.completions.create(
+            model=OPENAI_DEPLOYMENT,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+    except APITimeoutError as e:
+        raise DeadlineExceeded(timeout, "") from e
+    watchdog = threading.Timer(max(deadline - time.monotonic(), 0), stream.close)
+    watchdog.daemon = True
+    watchdog.start()
+    parts = []
+    usage = None
+    try:
+        for chunk in stream:
+            if chunk.usage:
+                usage = _usage_summary(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                if progress is not None:
+                    progress.append(chunk.choices[0].delta.content)
+            if progress is not None and progress.cancelled():
+                raise JobCancelled("".join(parts))
+            if time.monotonic() > deadline:
+                raise DeadlineExceeded(timeout, "".join(parts))
+    except (JobCancelled, DeadlineExceeded):
+        raise
+    except Exception as e:
+        # 제한 시간에 연결을 닫아 중단된 경우
+        if time.monotonic() >= deadline:
+            raise DeadlineExceeded(timeout, "".join(parts)) from e
+        raise
+    finally:
+        watchdog.cancel()
+        stream.close()
+    if time.monotonic() >= deadline and usage is None:
+        # 연결이 닫혀 응답이 오류 없이 끝난 것처럼 보이는 경우
+        raise DeadlineExceeded(timeout, "".join(parts))
+
+    usage = usage or {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    logger.info(f"GPT 호출: prompt={usage['prompt_tokens']} cached={usage['cached_tokens']} completion={usage['completion_tokens']}")
+    return {"content": "".join(parts), "usage": usage}
+
+# GPT 호출 함수
+def ask_openai(prompt=None, messages=None, progress=None):
+    if not messages:
+        if not prompt:
+            raise ValueError("prompt 또는 messages 중 하나는 반드시 필요합니다.")
+        messages = [
+            {"role": "system", "content": "당신은 산업 분석 전문가입니다."},
+            {"role": "user", "content": prompt}
+        ]
+    return chat_completion(messages, progress)["content"]
+
+def _chat_messages(chat_history):
+    messages = []
+    for q, a in chat_history:
+        messages.append({"role": "user", "content": q})
+        messages.append({"role": "assistant", "content": a})
+    return messages
+
+# 섹션별 참고 자료 블록
+def _evidence_block(section_evidence, section_index):
+    if section_index >= len(section_evidence) or not section_evidence[section_index]:
+        return ""
+    return f"""
+**참고 자료 (검색 결과):**
+{section_evidence[section_index]}
+
+참고 자료의 수치와 사례를 우선 활용하고, 자료에 없는 내용은 일반적인 분석임이 드러나도록 작성하세요.
+"""
+
+# 섹션 작성 요청 (섹션 번호와 보고서 시작 시 검색한 참고 자료로만 결정되므로 이후 호출에서도 동일한 내용으로 재사용됨)
+def _section_prompt(section_index, section_evidence=()):
+    section = REPORT_SECTIONS[section_index]
+    return f"""
+이제 보고서의 다음 섹션을 작성해주세요:
+
+**섹션 {section_index + 1}: {section['title']}**
+
+이 섹션에서 다룰 내용: {section['description']}
+{_evidence_block(section_evidence, section_index)}
+지금까지의 대화 내용과 이전 섹션들을 참고하여 '{section['title']}' 섹션을 상세히 작성해주세요.
+"""
+
+# 질의응답/보고서 호출이 공유하는 메시지 접두부
+# 고정 시스템 프롬프트 → 산업군 → 대화 내역 → 작성된 섹션 순으로, 호출이 진행될수록 뒤에만 추가되어
+# 이전 호출의 프롬프트가 다음 호출의 접두부가 된다 (Azure OpenAI 프롬프트 캐시 재사용).
+# 호출마다 달라지는 요청은 항상 마지막 user 메시지로 붙인다.
+def _report_messages(industry, chat_history, report_sections=(), section_evidence=()):
+    messages = [
+        {"role": "system", "content": REPORT_SYSTEM_PROMPT},
+        {"role": "system", "content": f"분석 대상 산업군: '{industry}'"}
+    ]
+    messages += _chat_messages(chat_history)
+    for i, section in enumerate(report_sections):
+        messages.append({"role": "user", "content": _section_prompt(i, section_evidence)})
+        messages.append({"role": "assistant", "content": section["content"]})
+    return messages
+
+# 검색 결과 개수
+SEARCH_TOP = 5
+
+# Azure AI Search 검색 (캐시/사전 계산 인덱스를 거치지 않음)
+def search_index(keyword, top=SEARCH_TOP):
+    results = get_search_client().search(keyword, top=top)
+    docs = []
+    for i, result in enumerate(results):
+        title = result.get("title", f"문서 {i+1}")
+        chunk = result.get("chunk", "")
+        docs.append(f"{title}\n{chunk}")
+    return docs
+
+# 1. 키워드 기반 RAG 검색 (사전 계산 인덱스 → 공유 캐시 → Azure AI Search 순으로 조회)
+def search_documents(keyword, top=SEARCH_TOP):
+    recommend_index.log_query(keyword)
+    entry = recommend_index.lookup(keyword)
+    if entry and top == SEARCH_TOP:
+        return entry["search_results"]
+    return _cached_search(keyword, top)
+
+# 공유 캐시를 거친 검색 (사용 기록/사전 계산 인덱스는 사용하지 않음)
+def _cached_search(query, top):
+    return cache.get_or_compute("search", f"{top}:{normalize_keyword(query)}", lambda: search_index(query, top))
+
+# 섹션별 참고 자료 검색 설정
+EVIDENCE_TOP = int(os.getenv("SECTION_EVIDENCE_TOP", "3"))
+EVIDENCE_MAX_CHARS = int(os.getenv("SECTION_EVIDENCE_MAX_CHARS", "2000"))
+
+def _search_or_empty(query, top):
+    try:
+        return _cached_search(query, top)
+    except Exception:
+        logger.exception(f"참고 자료 검색 실패: {query}")
+        return []
+
+# 검색 결과를 글자 수 제한 안에서 참고 자료 블록으로 조합
+# 자료 번호/제목/구분자를 뺀 나머지 글자 수를 문서별 본문에 나누고, 조합한 결과도 제한을 넘지 않도록 자른다.
+def _format_evidence(docs):
+    if not docs:
+        return ""
+    headers = []
+    chunks = []
+    for i, doc in enumerate(docs):
+        title, _, chunk = doc.partition("\n")
+        headers.append(f"[자료 {i+1}] {title}\n")
+        chunks.append(" ".join(chunk.split()))
+    overhead = sum(map(len, headers)) + len("\n\n") * (len(docs) - 1)
+    max_chars = max(EVIDENCE_MAX_CHARS - overhead, 0) // len(docs)
+    blocks = [header + chunk[:max_chars] for header, chunk in zip(headers, chunks)]
+    return "\n\n".join(blocks)[:EVIDENCE_MAX_CHARS]
+
+# 보고서 섹션별 참고 자료 검색 ("산업군 + 섹션 주제" 질의를 동시에 실행)
+# 질의가 모두 산업군명으로 시작해 결과가 많이 겹치므로, 섹션마다 돌아가며 아직 배정되지 않은 최상위 문서를
+# 하나씩 가져가 중복을 없앤다 (라운드마다 시작 섹션을 바꿔 앞 섹션이 공유 문서를 독차지하지 않도록 함).
+# 그래도 문서를 하나도 받지 못한 섹션은 공유 문서라도 최상위 결과를 사용한다.
+def retrieve_section_evidence(industry):
+    queries = [f"{industry} {section['title']}" for section in REPORT_SECTIONS]
+    # 중복 제거 후에도 섹션당 EVIDENCE_TOP 개가 남도록 여유 있게 검색
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        results = list(executor.map(lambda query: _search_or_empty(query, EVIDENCE_TOP * 4), queries))
+
+    seen = set()
+    selected = [[] for _ in queries]
+    positions = [0] * len(queries)
+    for round_index in range(EVIDENCE_TOP):
+        for offset in range(len(queries)):
+            i = (round_index + offset) % len(queries)
+            docs = results[i]
+            while positions[i] < len(docs) and docs[positions[i]] in seen:
+                positions[i] += 1
+            if positions[i] < len(docs):
+                seen.add(docs[positions[i]])
+                selected[i].append(docs[positions[i]])
+    for docs, chosen in zip(results, selected):
+        if not chosen and docs:
+            chosen.append(docs[0])
+    return [_format_evidence(docs) for docs in selected]
+
+# 추천 결과에서 산업군명 목록 추출
+def parse_recommendations(recommendations):
+    recommendation_list = []
+    for line in recommendations.split("\n"):
+        line = line.strip("-• ").strip()
+        if ':' in line and any(c.isalpha() for c in line):
+            title = line.split(':')[0].strip()
+            if title:
+                recommendation_list.append(title)
+    return recommendation_list[:5]
+
+# GPT 산업군 추천 (캐시/사전 계산 인덱스를 거치지 않으며, 다른 GPT 호출과 같이 토큰 사용량 포함)
+def generate_recommendations(keyword, search_results, progress=None):
+    combined_text = "\n\n".join(search_results)
+    prompt = f"""
+다음은 '{keyword}' 키워드에 대해 검색된 문서 내용입니다:
+
+{combined_text}
+
+이 정보를 바탕으로 관련된 유망 산업군을 5개 추천해 주세요.
+각 산업군은 다음 형식으로 작성해 주세요:
+- 산업군명: 간단한 설명 (1-2문장)
+
+반드시 각 줄은 "산업군명:"으로 시작하고 그 뒤에 설명이 오도록 작성해 주세요.
+        """
+    result = chat_completion([
+        {"role": "system", "content": "당신은 산업 분석 전문가입니다."},
+        {"role": "user", "content": prompt}
+    ], progress)
+    recommendations = result["content"]
+    if not recommendations:
+        return None
+    return {"raw": recommendations, "list": parse_recommendations(recommendations), "usage": result["usage"]}
+
+# 사전 계산 인덱스/공유 캐시에 있는 추천 결과만 조회 (GPT 를 호출하지 않으며 없으면 None)
+def cached_recommendations(keyword):
+    entry = recommend_index.lookup(keyword)
+    if entry:
+        return {"raw": entry["raw"], "list": entry["list"]}
+    return cache.get("recommend", normalize_keyword(keyword))
+
+# 2. GPT 산업군 추천 (사전 계산 인덱스 → 공유 캐시 → GPT 순으로 조회)
+def recommend_industries(keyword, search_results, progress=None):
+    cached = cached_recommendations(keyword)
+    if cached:
+        return cached
+    recommendations = generate_recommendations(keyword, search_results, progress)
+    if recommendations:
+        # 토큰 사용량은 이번 호출에만 해당하므로 캐시에는 저장하지 않음
+        cache.set("recommend", normalize_keyword(keyword), {"raw": recommendations["raw"], "list": recommendations["list"]})
+    return recommendations
+
+# 3. 산업군 GPT 질의응답
+def _answer_messages(industry, chat_history, question):
+    messages = _report_messages(industry, chat_history)
+    messages.append({"role": "user", "content": question})
+    return messages
+
+def answer_question(industry, chat_history, question, progress=None):
+    return chat_completion(_answer_messages(industry, chat_history, question), progress)
+
+# 4. 보고서 섹션 작성
+def _write_section_messages(industry, chat_history, report_sections, section_index, section_evidence=()):
+    messages = _report_messages(industry, chat_history, report_sections[:section_index], section_evidence)
+    messages.append({"role": "user", "content": _section_prompt(section_index, section_evidence)})
+    return messages
+
+def write_section(industry, chat_history, report_sections, section_index, section_evidence=(), progress=None):
+    return chat_completion(_write_section_messages(industry, chat_history, report_sections, section_index, section_evidence), progress)
+
+# 5. 보고서 섹션 수정 (사용자 요청 반영, 수정 대상 및 이전/다음 섹션은 접두부에 포함)
+def _revise_section_messages(industry, chat_history, report_sections, section_index, instruction, section_evidence=()):
+    selected_section = REPORT_SECTIONS[section_index]
+    messages = _report_messages(industry, chat_history, report_sections, section_evidence)
+
+    rewrite_prompt = f"""
+위 보고서의 섹션 {section_index + 1} '{selected_section['title']}' 섹션을 사용자의 요청에 따라 수정해주세요.
+
+**사용자 수정 요청:**
+{instruction}
+
+**수정 지침:**
+1. 사용자의 수정 요청사항을 정확히 반영하세요
+2. 이전/다음 섹션과 자연스럽게 연결되도록 작성하세요
+3. 기존 내용의 장점은 유지하면서 요청사항만 개선하세요
+4. 보고서 작성 지침을 그대로 따르세요
+
+사용자의 요청을 반영하여 '{selected_section['title']}' 섹션을 수정해주세요.
+"""
+    messages.append({"role": "user", "content": rewrite_prompt})
+    return messages
+
+def revise_section(industry, chat_history, report_sections, section_index, instruction, section_evidence=(), progress=None):
+    return chat_completion(_revise_section_messages(industry, chat_history, report_sections, section_index, instruction, section_evidence), progress)
+
+# 6. 보고서 섹션 완전 재작성 (최초 작성 시와 같은 접두부 사용)
+def _rewrite_section_messages(industry, chat_history, report_sections, section_index, instruction="", section_evidence=()):
+    selected_section = REPORT_SECTIONS[section_index]
+    messages = _report_messages(industry, chat_history, report_sections[:section_index], section_evidence)
+
+    extra_request = f"**사용자 추가 요청:**\n{instruction}\n" if instruction.strip() else ""
+    rewrite_prompt = f"""
+'{selected_section['title']}' 섹션을 처음부터 다시 작성해주세요.
+
+**섹션 설명:** {selected_section['description']}
+{_evidence_block(section_evidence, section_index)}
+{extra_request}
+'{selected_section['title']}' 섹션을 새롭게 작성해주세요.
+"""
+    messages.append({"role": "user", "content": rewrite_prompt})
+    return messages
+
+def rewrite_section(industry, chat_history, report_sections, section_index, instruction="", section_evidence=(), progress=None):
+    return chat_completion(_rewrite_section_messages(industry, chat_history, report_sections, section_index, instruction, section_evidence), progress)
+
+# 중단된 GPT 작업 이어서 작성 (원래 요청 + 중단 전까지의 응답 뒤에 이어쓰기 요청을 붙임)
+# 종류를 추가하면 jobs.RESUMABLE_KINDS 에도 추가해야 화면에 "이어서 작성" 버튼이 표시됨
+MESSAGE_BUILDERS = {
+    "answer": _answer_messages,
+    "write_section": _write_section_messages,
+    "revise_section": _revise_section_messages,
+    "rewrite_section": _rewrite_section_messages,
+}
+
+CONTINUE_PROMPT = "응답이 중간에 끊겼습니다. 이미 작성한 부분은 반복하지 말고, 끊긴 지점부터 바로 이어서 작성해주세요."
+
+def continue_generation(step, payload, partial, progress=None):
+    messages = MESSAGE_BUILDERS[step](**payload)
+    messages.append({"role": "assistant", "content": partial})
+    messages.append({"role": "user", "content": CONTINUE_PROMPT})
+    # 다시 중단되더라도 부분 결과에 앞부분이 포함되도록 먼저 기록
+    if progress is not None:
+        progress.append(partial)
+    result = chat_completion(messages, progress)
+    result["content"] = partial + result["content"]
+    return result
+
+# 7. 보고서 파일 생성 (JSON 으로 전달할 수 있도록 base64 인코딩)
+def export_report(content, title, file_format):
+    create, mime_type, file_ext = EXPORT_FORMATS[file_format]
+    file_buffer = create(content, title)
+    return {
+        "data": base64.b64encode(file_buffer.getvalue()).decode("ascii"),
+        "mime": mime_type,
+        "ext": file_ext,
+        "format": file_format,
+    }
+
+# 작업 종류별 처리 함수 (API 워커와 로컬 실행이 공유)
+STEPS = {
+    "search": search_documents,
+    "recommend_cached": cached_recommendations,
+    "recommend": recommend_industries,
+    "answer": answer_question,
+    "write_section": write_section,
+    "revise_section": revise_section,
+    "rewrite_section": rewrite_section,
+    "section_evidence": retrieve_section_evidence,
+    "export": export_report,
+    "continue": continue_generation,
+}
+
+# 응답을 스트리밍하며 부분 결과 기록/취소 확인이 가능한 작업
+STREAMING_STEPS = set(MESSAGE_BUILDERS) | {"continue", "recommend"}
+
+def run_step(kind, payload, progress=None):
+    if kind not in STEPS:
+        raise ValueError(f"알 수 없는 작업 종류입니다: {kind}")
+    if progress is not None and kind in STREAMING_STEPS:
+        payload = {**payload, "progress": progress}
+    return STEPS[kind](**payload)
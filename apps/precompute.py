@@ -0,0 +1,135 @@
+import argparse
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from azure.core.credentials import AzureKeyCredential
+import pipeline
+import recommend_index
+from recommend_index import normalize_keyword
+
+logger = logging.getLogger(__name__)
+
+# 인덱서의 EntityRecognitionSkill 출력 필드
+ENTITY_FIELDS = [field.strip() for field in os.getenv("AZURE_SEARCH_ENTITY_FIELDS", "persons,locations,organizations").split(",") if field.strip()]
+# 설정 시 인덱서 마지막 실행 시각으로 인덱스 변경 여부 판단
+SEARCH_INDEXER = os.getenv("AZURE_SEARCH_INDEXER")
+
+
+# 검색 인덱스 상태 (달라지면 사전 계산 결과를 다시 만든다)
+def index_fingerprint():
+    fingerprint = {"document_count": pipeline.get_search_client().get_document_count()}
+    if SEARCH_INDEXER:
+        from azure.search.documents.indexes import SearchIndexerClient
+        indexer_client = SearchIndexerClient(
+            endpoint=pipeline.SEARCH_ENDPOINT,
+            credential=AzureKeyCredential(pipeline.SEARCH_KEY)
+        )
+        status = indexer_client.get_indexer_status(SEARCH_INDEXER)
+        if status.last_result and status.last_result.end_time:
+            fingerprint["indexer_last_run"] = status.last_result.end_time.isoformat()
+    return fingerprint
+
+
+# 코퍼스 전체에서 가장 많은 문서에 등장한 엔터티
+# 문서를 페이지로 넘기지 않고 필드별 패싯 집계로 상위 값만 받는다 (엔터티 필드는 facetable 이어야 함).
+def top_entities(limit):
+    counter = Counter()
+    for field in ENTITY_FIELDS:
+        results = pipeline.get_search_client().search("*", facets=[f"{field},count:{limit}"], top=0)
+        for facet in (results.get_facets() or {}).get(field, []):
+            value = str(facet["value"]).strip()
+            if value:
+                counter[value] = max(counter[value], facet["count"])
+    return [entity for entity, _ in counter.most_common(limit)]
+
+
+# 키워드 하나에 대한 검색 결과와 추천 산업군 계산
+def build_entry(keyword):
+    search_results = pipeline.search_index(keyword)
+    if not search_results:
+        return None
+    recommendations = pipeline.generate_recommendations(keyword, search_results)
+    if not recommendations or not recommendations["list"]:
+        return None
+    return {"keyword": keyword, "search_results": search_results, "raw": recommendations["raw"], "list": recommendations["list"]}
+
+
+# 키워드별 결과를 계산해 인덱스 저장
+# 실패한 키워드는 이전 결과를 유지하고, 실패가 있으면 인덱스 상태를 기록하지 않아 다음 확인 때 다시 계산한다.
+def build(keywords, fingerprint, workers, previous=None):
+    previous_entries = previous["entries"] if previous else {}
+    entries = {}
+    failed = []
+
+    def run(keyword):
+        try:
+            return keyword, build_entry(keyword), False
+        except Exception:
+            logger.exception(f"사전 계산 실패: {keyword}")
+            return keyword, None, True
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for keyword, entry, error in executor.map(run, keywords):
+            key = normalize_keyword(keyword)
+            if error:
+                failed.append(keyword)
+                if key in previous_entries:
+                    entries[key] = previous_entries[key]
+            elif entry:
+                entries[key] = entry
+    recommend_index.save(entries, None if failed else fingerprint)
+    logger.info(f"사전 계산 완료: {len(entries)}/{len(keywords)}개 키워드 (실패 {len(failed)}개)")
+    if failed:
+        logger.warning("실패한 키워드가 있어 다음 확인 때 다시 계산합니다.")
+
+
+# 인기 검색어 + 주요 엔터티 (중복 제거, 인기 검색어 우선)
+def collect_keywords(queries, entities, since):
+    keywords = {}
+    for keyword in recommend_index.top_queries(queries, since=since) + top_entities(entities):
+        keywords.setdefault(normalize_keyword(keyword), keyword)
+    return list(keywords.values())
+
+
+# 인덱스가 바뀌었거나 사전 계산 결과가 오래되었으면 다시 만든다
+def refresh(args):
+    recommend_index.trim_queries(args.query_days * 24 * 3600)
+    fingerprint = index_fingerprint()
+    index = recommend_index.load()
+    if not args.force and index and index["fingerprint"] == fingerprint and time.time() - index["built_at"] < args.max_age * 3600:
+        logger.info("검색 인덱스 변경 없음, 사전 계산 생략")
+        return
+    keywords = collect_keywords(args.queries, args.entities, since=args.query_days * 24 * 3600)
+    logger.info(f"사전 계산 시작: {len(keywords)}개 키워드")
+    build(keywords, fingerprint, args.workers, previous=index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인기 키워드/엔터티 추천 결과 사전 계산")
+    parser.add_argument("--queries", type=int, default=30, help="포함할 인기 검색어 수")
+    parser.add_argument("--query-days", type=float, default=30, help="인기 검색어 집계 기간(일)")
+    parser.add_argument("--entities", type=int, default=30, help="포함할 엔터티 수")
+    parser.add_argument("--workers", type=int, default=4, help="동시 처리 키워드 수")
+    parser.add_argument("--max-age", type=float, default=24, help="인덱스가 그대로여도 다시 계산하는 주기(시간)")
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 다시 계산")
+    parser.add_argument("--watch", type=int, default=0, help="지정한 간격(초)마다 변경 여부 확인 (0 이면 1회 실행)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    while True:
+        try:
+            refresh(args)
+        except Exception:
+            if not args.watch:
+                raise
+            logger.exception("사전 계산 중 오류 발생")
+        if not args.watch:
+            break
+        args.force = False
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from cache import DATA_DIR, write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+# 사전 계산된 키워드 → 검색 결과/추천 산업군 인덱스 (precompute.py 가 생성)
+INDEX_PATH = os.path.join(DATA_DIR, "recommend_index.json")
+# 사용자가 검색한 키워드 기록 (인기 키워드 선정용)
+USAGE_LOG_PATH = os.path.join(DATA_DIR, "usage", "keywords.log")
+
+# 파일이 바뀔 때만 다시 읽도록 마지막으로 읽은 인덱스를 보관
+_loaded = {"mtime": None, "index": None}
+
+
+def normalize_keyword(keyword):
+    return " ".join(keyword.split()).lower()
+
+
+def load():
+    try:
+        mtime = os.path.getmtime(INDEX_PATH)
+    except FileNotFoundError:
+        return None
+    if mtime != _loaded["mtime"]:
+        _loaded["index"] = read_json(INDEX_PATH)
+        _loaded["mtime"] = mtime
+    return _loaded["index"]
+
+
+# 키워드에 대한 사전 계산 결과 조회 (없으면 None)
+def lookup(keyword):
+    index = load()
+    if not index:
+        return None
+    return index["entries"].get(normalize_keyword(keyword))
+
+
+def save(entries, fingerprint):
+    write_json(INDEX_PATH, {
+        "fingerprint": fingerprint,
+        "built_at": time.time(),
+        "entries": entries,
+    })
+
+
+# 검색 키워드 기록 (기록 실패가 검색을 막지 않도록 오류는 로그만 남김)
+def log_query(keyword):
+    keyword = normalize_keyword(keyword)
+    if not keyword:
+        return
+    try:
+        os.makedirs(os.path.dirname(USAGE_LOG_PATH), exist_ok=True)
+        with open(USAGE_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(f"{time.time():.0f}\t{keyword}\n")
+    except OSError:
+        logger.exception("검색 키워드 기록 실패")
+
+
+# 사용 기록 한 줄 해석 (잘리거나 섞인 줄은 None)
+def _parse_line(line):
+    timestamp, _, keyword = line.rstrip("\n").partition("\t")
+    try:
+        return float(timestamp), keyword
+    except ValueError:
+        return None
+
+
+def _read_log():
+    try:
+        with open(USAGE_LOG_PATH, encoding="utf-8", errors="replace") as f:
+            entries = [_parse_line(line) for line in f]
+    except FileNotFoundError:
+        return []
+    return [entry for entry in entries if entry and entry[1]]
+
+
+# 최근 since 초 동안 가장 많이 검색된 키워드
+def top_queries(limit, since=None):
+    now = time.time()
+    counter = Counter(
+        keyword for timestamp, keyword in _read_log()
+        if since is None or now - timestamp <= since
+    )
+    return [keyword for keyword, _ in counter.most_common(limit)]
+
+
+# since 초보다 오래된 기록과 깨진 줄을 지워 사용 기록 크기 유지
+# (다시 쓰는 사이에 추가된 몇 줄은 잃을 수 있으나 인기 검색어 집계에는 영향이 없음)
+def trim_queries(since):
+    if not os.path.exists(USAGE_LOG_PATH):
+        return
+    now = time.time()
+    entries = [(timestamp, keyword) for timestamp, keyword in _read_log() if now - timestamp <= since]
+    tmp_path = f"{USAGE_LOG_PATH}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{timestamp:.0f}\t{keyword}\n" for timestamp, keyword in entries)
+        os.replace(tmp_path, USAGE_LOG_PATH)
+    except OSError:
+        logger.exception("검색 키워드 기록 정리 실패")
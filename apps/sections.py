@@ -0,0 +1,19 @@
+# 보고서 섹션 정의 (Azure SDK 없이도 가져올 수 있도록 pipeline 과 분리)
+REPORT_SECTIONS = [
+    {"title": "산업 개요 및 시장 동향", "description": "산업의 정의, 현황, 최신 트렌드"},
+    {"title": "시장 규모 및 성장 전망", "description": "구체적인 시장 규모 데이터와 성장 예측"},
+    {"title": "주요 경쟁사 분석", "description": "주요 플레이어들의 현황과 포지셔닝"},
+    {"title": "핵심 기술 및 혁신 동향", "description": "기술적 발전과 혁신 사례"},
+    {"title": "타겟 고객 및 시장 세그먼트", "description": "주요 고객층과 시장 세분화"},
+    {"title": "사업 기회 및 진입 전략", "description": "시장 기회와 전략적 접근"},
+    {"title": "리스크 요인 및 대응 방안", "description": "잠재적 위험과 완화 전략"},
+    {"title": "결론 및 향후 전망", "description": "종합 분석과 미래 전망"}
+]
+
+
+# 섹션 제목/내용을 보고서 본문 형식으로 조합
+def join_sections(sections):
+    return "\n\n".join([
+        f"## {section['title']}\n{section['content']}"
+        for section in sections
+    ])
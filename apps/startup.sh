@@ -14,4 +14,11 @@ pip install python-pptx==1.0.2
 pip install Pillow==10.4.0
 pip install typing-extensions==4.15.0
 
+# 파이프라인 API 및 워커를 분리 실행하는 경우 (PIPELINE_API_URL 설정 필요)
+# python api.py --port 8080 &
+# python worker.py --processes 4 &
+
+# 인기 키워드/엔터티 추천 결과 사전 계산 (인덱스 변경 시 자동 갱신)
+# python precompute.py --watch 600 &
+
 python -m streamlit run app.py --server.port 8000 --server.address 0.0.0.0
\ No newline at end of file
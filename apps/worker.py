@@ -0,0 +1,67 @@
+import argparse
+import logging
+import multiprocessing
+import time
+import jobs
+import pipeline
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.2
+
+
+# 작업 하나 처리 (GPT 작업은 부분 결과를 기록하며 취소 요청 시 중단)
+# 실제로 처리를 시작하는 이 시점에만 실행 상태로 전환한다.
+def process(job_id):
+    # 대기 중에 취소된 작업은 실행 상태로 바꾸지 않고 종료
+    if jobs.is_cancelled(job_id):
+        jobs.mark_cancelled(job_id)
+        return
+    job = jobs.start(job_id)
+    if job is None:
+        return
+    progress = jobs.JobProgress(job["id"])
+    try:
+        result = pipeline.run_step(job["kind"], job["payload"], progress=progress)
+    except pipeline.JobCancelled:
+        progress.flush()
+        jobs.mark_cancelled(job["id"])
+    except Exception as e:
+        progress.flush()
+        logger.exception(f"작업 실패: {job['id']} ({job['kind']})")
+        jobs.fail(job["id"], str(e))
+    else:
+        progress.flush()
+        jobs.complete(job["id"], result)
+
+
+# 큐를 폴링하며 작업 처리 (프로세스마다 하나씩 실행)
+def run_worker():
+    logger.info("워커 시작")
+    while True:
+        jobs.housekeeping()
+        job_id = jobs.claim()
+        if job_id is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        process(job_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 작업 워커")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(processName)s] %(message)s")
+    workers = [
+        multiprocessing.Process(target=run_worker, name=f"worker-{i}", daemon=True)
+        for i in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()